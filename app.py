@@ -1,10 +1,21 @@
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
+import httpx
 from langchain_groq import ChatGroq
+from langchain_core.messages import SystemMessage
 import os
+import sys
+import re
+import asyncio
+import threading
 from dotenv import load_dotenv
-from typing import List, Dict
+from types import MappingProxyType
+from typing import AsyncIterator, Iterator, List, Mapping
 import logging
-from datetime import datetime
+import queue
+import atexit
+from logging.handlers import QueueHandler, QueueListener
+from time import perf_counter, sleep
 
 # ============================================
 # CONFIGURATION & LOGGING
@@ -12,24 +23,54 @@ from datetime import datetime
 load_dotenv()
 
 # Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+@st.cache_resource(show_spinner=False)
+def setup_logging() -> QueueListener:
+    """Route log records through a queue so a background thread does the writes.
+
+    Cached so reruns of the script do not attach duplicate handlers.
+    """
+    log_queue = queue.Queue(-1)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    )
+    listener = QueueListener(log_queue, stream_handler)
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    root_logger.addHandler(QueueHandler(log_queue))
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+setup_logging()
 logger = logging.getLogger(__name__)
 
+# Number of previous user/assistant turns sent to the LLM
+MAX_HISTORY_TURNS = 8
+
+# Minimum gap between accepted chat submissions
+SUBMIT_DEBOUNCE_SECONDS = 0.8
+
+# Streamed tokens are batched into UI updates at most this often
+STREAM_FLUSH_SECONDS = 0.05
+
+# Approximate upper bound on prompt tokens sent per request
+PROMPT_TOKEN_BUDGET = 6000
+
+# Stored chat content per session before the oldest exchanges are pruned
+MAX_SESSION_BYTES = 512_000
+
+# Client-side request and prompt-token budget shared by all sessions
+RATE_LIMIT_REQUESTS = 30
+RATE_LIMIT_TOKENS = 50_000
+RATE_LIMIT_WINDOW_SECONDS = 60
+
 # ============================================
-# PAGE CONFIG
+# STATIC MARKUP
 # ============================================
-st.set_page_config(
-    page_title="Interview Preparation Coach",
-    page_icon="📋",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
 # Custom CSS for professional styling
-st.markdown("""
+CUSTOM_CSS = """
     <style>
     .main {
         max-width: 1000px;
@@ -113,7 +154,47 @@ st.markdown("""
         color: #1a1a1a;
     }
     </style>
-""", unsafe_allow_html=True)
+"""
+
+HEADER_HTML = """
+    <div class="header-container">
+        <div class="header-title">Interview Preparation Coach</div>
+        <div class="header-subtitle">
+            Professional technical interview preparation powered by advanced AI
+        </div>
+    </div>
+    """
+
+ABOUT_HTML = """
+        <div class="info-box">
+        <strong>Purpose:</strong> Prepare for technical interviews through realistic 
+        practice with AI feedback.
+        
+        <strong>Features:</strong>
+        - Personalized interview questions
+        - Detailed performance feedback
+        - Follow-up questions for deeper evaluation
+        - Targeted improvement recommendations
+        
+        <strong>Technology Stack:</strong>
+        - Groq API (High-performance LLM inference)
+        - LLaMA 3.3 70B (Advanced open-source model)
+        - Streamlit (Professional web interface)
+        </div>
+        """
+
+# ============================================
+# PAGE CONFIG
+# ============================================
+st.set_page_config(
+    page_title="Interview Preparation Coach",
+    page_icon="📋",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Custom CSS for professional styling
+st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
 # ============================================
 # SYSTEM PROMPTS (Configurable by Interview Type)
@@ -244,51 +325,295 @@ def initialize_llm():
         return None
     
     try:
+        # One pooled keep-alive client shared by every session, so requests
+        # reuse open connections instead of paying a TLS handshake each time
+        limits = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+        timeout = httpx.Timeout(60.0, connect=5.0)
         llm = ChatGroq(
             model="llama-3.3-70b-versatile",
             api_key=api_key,
             temperature=0.7,
-            max_tokens=2048
+            max_tokens=2048,
+            http_client=httpx.Client(limits=limits, http2=True, timeout=timeout),
+            http_async_client=httpx.AsyncClient(limits=limits, http2=True, timeout=timeout)
         )
         logger.info("LLM initialized successfully")
+        if os.getenv("GROQ_PREWARM") == "1":
+            asyncio.run_coroutine_threadsafe(warm_up_llm(llm), get_event_loop())
         return llm
     except Exception as e:
-        logger.error(f"Failed to initialize LLM: {str(e)}")
+        logger.error("Failed to initialize LLM: %s", e)
         return None
 
 
-def format_conversation_history(messages: List[Dict]) -> List[Dict]:
-    """Format conversation history for LLM."""
-    formatted = []
-    for msg in messages:
-        formatted.append({
-            "role": msg["role"],
-            "content": msg["content"]
-        })
-    return formatted
+async def warm_up_llm(llm: ChatGroq):
+    """Send a 1-token request so the first real turn skips the cold path."""
+    try:
+        await llm.ainvoke("hi", max_tokens=1)
+        logger.info("LLM warm-up request completed")
+    except Exception as e:
+        logger.error("LLM warm-up request failed: %s", e)
+
+
+@st.cache_resource(show_spinner=False)
+def load_system_messages() -> Mapping[str, SystemMessage]:
+    """Build one system message per interview type, shared across reruns.
+
+    The mapping is read-only since every session shares the cached object.
+    """
+    return MappingProxyType({
+        sys.intern(interview_type): SystemMessage(content=prompt)
+        for interview_type, prompt in INTERVIEW_PROMPTS.items()
+    })
 
 
-def get_system_prompt(interview_type: str) -> str:
-    """Get the appropriate system prompt for the interview type."""
-    return INTERVIEW_PROMPTS.get(interview_type, INTERVIEW_PROMPTS["General"])
+def get_system_message(interview_type: str) -> SystemMessage:
+    """Get the prebuilt system message for the interview type."""
+    system_messages = load_system_messages()
+    return system_messages.get(interview_type, system_messages["General"])
+
+
+def history_window_step(max_turns: int) -> int:
+    """Number of messages the history window slides by at a time."""
+    return 2 * max(1, max_turns // 2)
+
+
+def history_window_start(messages: List, max_turns: int) -> int:
+    """Index of the first stored message sent to the LLM.
+
+    At most max_turns exchanges are sent before the newest message. The window
+    slides in blocks of half of max_turns rather than one turn at a time, so
+    the prompt prefix stays identical, and cacheable, between slides.
+    """
+    step = history_window_step(max_turns)
+    overflow = len(messages) - 1 - 2 * max_turns
+    if overflow <= 0:
+        return 0
+    return -(-overflow // step) * step
+
+
+def approx_tokens(text: str) -> int:
+    """Estimate the token count of text at roughly 4 characters per token."""
+    return (len(text) + 3) >> 2
+
+
+def count_prompt_tokens(messages: List) -> int:
+    """Estimate the token count of a system message followed by history dicts."""
+    return approx_tokens(messages[0].content) + sum(
+        approx_tokens(msg["content"]) for msg in messages[1:]
+    )
+
+
+def fit_to_token_budget(messages: List, budget: int = PROMPT_TOKEN_BUDGET) -> List:
+    """Drop the oldest exchanges until the prompt fits the token budget.
+
+    One exchange (a message and any replies up to the next user message) is
+    dropped at a time, so no more context is lost than needed. The system
+    message and the newest user message are always kept.
+    """
+    total = count_prompt_tokens(messages)
+    dropped = 0
+    while total > budget and len(messages) > 2:
+        total -= approx_tokens(messages.pop(1)["content"])
+        dropped += 1
+        while len(messages) > 2 and messages[1]["role"] != "user":
+            total -= approx_tokens(messages.pop(1)["content"])
+            dropped += 1
+    if dropped:
+        logger.info("Truncated %d history messages to fit token budget (%d tokens)", dropped, total)
+    return messages
+
+
+@st.cache_resource(show_spinner=False)
+def get_rate_limiter() -> dict:
+    """Create the process-wide request and token bucket."""
+    return {
+        "requests": RATE_LIMIT_REQUESTS,
+        "tokens": RATE_LIMIT_TOKENS,
+        "refill_at": perf_counter() + RATE_LIMIT_WINDOW_SECONDS,
+        "lock": threading.Lock()
+    }
+
+
+def acquire_rate_limit(prompt_tokens: int):
+    """Block until the shared bucket can afford another request.
+
+    Waiting locally is cheaper than a 429 from the API and its retry backoff.
+    A spinner is shown whenever the caller has to wait, whether for the
+    bucket to refill or for another session that is already waiting.
+    """
+    bucket = get_rate_limiter()
+    lock = bucket["lock"]
+    if not lock.acquire(blocking=False):
+        with st.spinner("Waiting for rate limit..."):
+            lock.acquire()
+    try:
+        now = perf_counter()
+        exhausted = bucket["requests"] <= 0 or bucket["tokens"] < prompt_tokens
+        if exhausted and now < bucket["refill_at"]:
+            wait = bucket["refill_at"] - now
+            logger.info("Rate limit reached, waiting %.1fs", wait)
+            with st.spinner(f"Waiting for rate limit ({wait:.0f}s)..."):
+                sleep(wait)
+            now = perf_counter()
+        if now >= bucket["refill_at"]:
+            bucket["requests"] = RATE_LIMIT_REQUESTS
+            bucket["tokens"] = RATE_LIMIT_TOKENS
+            bucket["refill_at"] = now + RATE_LIMIT_WINDOW_SECONDS
+        bucket["requests"] -= 1
+        bucket["tokens"] -= prompt_tokens
+    finally:
+        lock.release()
+
+
+@st.cache_resource(show_spinner=False)
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Start a background event loop shared by all sessions for async streaming."""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="llm-event-loop", daemon=True).start()
+    return loop
+
+
+async def astream_tokens(llm: ChatGroq, messages: List) -> AsyncIterator[str]:
+    """Yield response text deltas from the LLM as they are generated."""
+    async for chunk in llm.astream(messages):
+        if chunk.content:
+            yield chunk.content
+
+
+def stream_tokens(llm: ChatGroq, messages: List) -> Iterator[str]:
+    """Drive astream_tokens on the background loop for synchronous consumers."""
+    loop = get_event_loop()
+    tokens = astream_tokens(llm, messages)
+    try:
+        while True:
+            try:
+                yield asyncio.run_coroutine_threadsafe(tokens.__anext__(), loop).result()
+            except StopAsyncIteration:
+                break
+    finally:
+        asyncio.run_coroutine_threadsafe(tokens.aclose(), loop).result()
+
+
+def coalesce_tokens(tokens: Iterator[str], window: float = STREAM_FLUSH_SECONDS) -> Iterator[str]:
+    """Batch streamed tokens into chunks flushed every `window` seconds.
+
+    The first token is yielded immediately so time-to-first-token is unchanged.
+    """
+    buffer = []
+    last_flush = None
+    for token in tokens:
+        if last_flush is None:
+            last_flush = perf_counter()
+            yield token
+            continue
+        buffer.append(token)
+        if perf_counter() - last_flush >= window:
+            yield "".join(buffer)
+            buffer.clear()
+            last_flush = perf_counter()
+    if buffer:
+        yield "".join(buffer)
+
+
+# A "---" separator on a line of its own (not a Markdown table rule)
+SEPARATOR_PATTERN = re.compile(r"^[ \t]*-{3,}[ \t]*$", re.MULTILINE)
+SCORE_LINE_PATTERN = re.compile(r"^.*\b(?:Score|Rating):", re.MULTILINE)
 
 
 def parse_response_with_score(response: str) -> tuple:
-    """Parse response to extract main content and scoring if present."""
-    if "Score:" in response or "Rating:" in response:
-        parts = response.split("---")
-        if len(parts) > 1:
-            return parts[0].strip(), parts[1].strip()
-    return response, ""
+    """Parse response to extract main content and scoring if present.
+
+    The score block runs from the last separator before the first Score/Rating
+    line to the next separator after it. Anything after that block, such as a
+    follow-up question, stays in the main content.
+    """
+    separators = list(SEPARATOR_PATTERN.finditer(response))
+    if not separators:
+        return response, ""
+    score_line = SCORE_LINE_PATTERN.search(response, separators[0].end())
+    if not score_line:
+        return response, ""
+    opening = [sep for sep in separators if sep.end() <= score_line.start()][-1]
+    closing = next((sep for sep in separators if sep.start() >= score_line.end()), None)
+    if closing:
+        score_content = response[opening.end():closing.start()]
+        trailing = response[closing.end():].strip()
+    else:
+        score_content = response[opening.end():]
+        trailing = ""
+    main_content = response[:opening.start()].strip()
+    if trailing:
+        main_content = f"{main_content}\n\n{trailing}"
+    return main_content, score_content.strip()
+
+
+def render_response(response: str):
+    """Render an assistant response with its score block, if any."""
+    main_content, score_content = parse_response_with_score(response)
+    st.markdown(main_content)
+    if score_content:
+        st.markdown(f"<div class='feedback-score'>{score_content}</div>", unsafe_allow_html=True)
+
+
+def accept_submission() -> bool:
+    """Accept a chat submission unless it follows the previous one too closely."""
+    now = perf_counter()
+    last_submit_ts = st.session_state.last_submit_ts
+    if last_submit_ts is not None and now - last_submit_ts < SUBMIT_DEBOUNCE_SECONDS:
+        logger.info("Ignoring duplicate submission within debounce window")
+        st.toast("Message not sent: please wait a moment before sending again.")
+        return False
+    st.session_state.last_submit_ts = now
+    return True
+
+
+def rerun_chat_section():
+    """Rerun only the chat fragment, or the whole app during a full-app run."""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+
+def session_footprint() -> int:
+    """Total size in bytes of the chat content stored in this session."""
+    return sum(len(msg["content"].encode()) for msg in st.session_state.messages)
+
+
+def prune_session(max_bytes: int = MAX_SESSION_BYTES):
+    """Drop the oldest exchanges once stored history exceeds max_bytes, down to half.
+
+    An exchange runs up to the next user message, so a user turn left without
+    a reply by a failed request is dropped on its own.
+    """
+    messages = st.session_state.messages
+    total = session_footprint()
+    if total <= max_bytes:
+        return
+    dropped = 0
+    while total > max_bytes // 2:
+        next_user = next(
+            (i for i in range(1, len(messages)) if messages[i]["role"] == "user"),
+            None
+        )
+        if next_user is None:
+            break
+        total -= sum(len(msg["content"].encode()) for msg in messages[:next_user])
+        del messages[:next_user]
+        dropped += next_user
+    if dropped:
+        logger.info("Pruned %d messages from session history (%d bytes kept)", dropped, total)
 
 
 def log_interaction(interview_type: str, user_input: str, response: str, duration: float):
     """Log interview interactions for monitoring."""
     logger.info(
-        f"Interaction - Type: {interview_type}, "
-        f"Input length: {len(user_input)}, "
-        f"Response length: {len(response)}, "
-        f"Duration: {duration:.2f}s"
+        "Interaction - Type: %s, Input length: %d, Response length: %d, Duration: %.2fs",
+        interview_type,
+        len(user_input),
+        len(response),
+        duration
     )
 
 
@@ -304,21 +629,23 @@ if "interview_type" not in st.session_state:
 if "message_count" not in st.session_state:
     st.session_state.message_count = 0
 
+if "in_flight" not in st.session_state:
+    st.session_state.in_flight = False
+
+if "last_submit_ts" not in st.session_state:
+    st.session_state.last_submit_ts = None
+
+if "pending_input" not in st.session_state:
+    st.session_state.pending_input = None
+
+if "response_failed" not in st.session_state:
+    st.session_state.response_failed = False
+
 # ============================================
 # MAIN LAYOUT
 # ============================================
 # Header
-st.markdown(
-    """
-    <div class="header-container">
-        <div class="header-title">Interview Preparation Coach</div>
-        <div class="header-subtitle">
-            Professional technical interview preparation powered by advanced AI
-        </div>
-    </div>
-    """,
-    unsafe_allow_html=True
-)
+st.markdown(HEADER_HTML, unsafe_allow_html=True)
 
 # ============================================
 # SIDEBAR CONFIGURATION
@@ -327,7 +654,7 @@ with st.sidebar:
     st.markdown("### Interview Settings")
     
     # Interview type selection
-    interview_type = st.selectbox(
+    interview_type = sys.intern(st.selectbox(
         "Interview Type",
         options=[
             "General",
@@ -338,61 +665,40 @@ with st.sidebar:
             "Behavioral"
         ],
         help="Select the type of interview you're preparing for"
-    )
+    ))
     st.session_state.interview_type = interview_type
     
+    max_history_turns = st.slider(
+        "Context Window (turns)",
+        min_value=1,
+        max_value=20,
+        value=MAX_HISTORY_TURNS,
+        help="Number of previous exchanges the interviewer remembers. The full conversation is still shown."
+    )
+    
     st.divider()
     
     # Session management
     st.markdown("### Session Management")
     
-    col1, col2 = st.columns(2)
-    with col1:
-        if st.button("Clear History", use_container_width=True):
-            st.session_state.messages = []
-            st.session_state.message_count = 0
-            st.rerun()
-    
-    with col2:
-        if st.button("New Session", use_container_width=True):
-            st.session_state.messages = []
-            st.session_state.message_count = 0
-            st.rerun()
+    # The click already triggers a rerun, and everything below the sidebar
+    # renders after this point, so no explicit st.rerun() is needed
+    if st.button("Reset Session", use_container_width=True):
+        st.session_state.messages = []
+        st.session_state.message_count = 0
     
     st.divider()
     
     # Information panel
     st.markdown("### About This Tool")
     
-    st.markdown(
-        """
-        <div class="info-box">
-        <strong>Purpose:</strong> Prepare for technical interviews through realistic 
-        practice with AI feedback.
-        
-        <strong>Features:</strong>
-        - Personalized interview questions
-        - Detailed performance feedback
-        - Follow-up questions for deeper evaluation
-        - Targeted improvement recommendations
-        
-        <strong>Technology Stack:</strong>
-        - Groq API (High-performance LLM inference)
-        - LLaMA 3.3 70B (Advanced open-source model)
-        - Streamlit (Professional web interface)
-        </div>
-        """,
-        unsafe_allow_html=True
-    )
+    st.markdown(ABOUT_HTML, unsafe_allow_html=True)
     
     st.divider()
     
+    # Message counts live in the chat section, which reruns on its own
     st.markdown("### Session Statistics")
-    col1, col2 = st.columns(2)
-    with col1:
-        st.markdown(f"<div class='stat-item'><span class='stat-label'>Messages:</span> {len(st.session_state.messages)}</div>", unsafe_allow_html=True)
-    with col2:
-        st.markdown(f"<div class='stat-item'><span class='stat-label'>Type:</span> {interview_type}</div>", unsafe_allow_html=True)
+    st.markdown(f"<div class='stat-item'><span class='stat-label'>Type:</span> {interview_type}</div>", unsafe_allow_html=True)
     
     st.divider()
     st.markdown(
@@ -400,19 +706,6 @@ with st.sidebar:
         unsafe_allow_html=True
     )
 
-# ============================================
-# MAIN CONTENT AREA
-# ============================================
-# Display configuration
-with st.container():
-    col1, col2 = st.columns([3, 1])
-    with col1:
-        st.markdown(f"**Current Focus:** {interview_type} Interview")
-    with col2:
-        st.markdown(f"**Messages:** {len(st.session_state.messages)}")
-
-st.divider()
-
 # ============================================
 # CHAT INTERFACE
 # ============================================
@@ -427,60 +720,121 @@ if llm is None:
     st.info("Setup instructions: Visit https://console.groq.com to create your API key.")
     st.stop()
 
-# Display chat history
-for message in st.session_state.messages:
-    with st.chat_message(message["role"]):
-        st.markdown(message["content"])
-
 # ============================================
 # CHAT INPUT & RESPONSE
 # ============================================
-if user_input := st.chat_input(
-    "Enter your question or share your answer...",
-    key="user_input"
-):
-    # Add user message to history
-    st.session_state.messages.append({
-        "role": "user",
-        "content": user_input
-    })
-    st.session_state.message_count += 1
+@st.fragment
+def chat_section(llm: ChatGroq, interview_type: str, max_history_turns: int):
+    """Render the chat transcript, input box and streamed response.
+
+    Runs as a fragment so submitting a message reruns only this section
+    instead of the whole script. The session statistics are drawn here for
+    the same reason; outside the fragment they would go stale every turn.
+    """
+    # Display configuration and session statistics. Every turn ends with a
+    # rerun of this fragment, so the counts are always current.
+    col1, col2, col3 = st.columns([3, 1, 1])
+    with col1:
+        st.markdown(f"**Current Focus:** {interview_type} Interview")
+    with col2:
+        st.markdown(f"**Messages:** {len(st.session_state.messages)}")
+    with col3:
+        st.markdown(f"**Session:** {session_footprint() // 1024} KB")
     
-    # Display user message
-    with st.chat_message("user"):
-        st.markdown(user_input)
+    st.divider()
     
-    # Get LLM response
-    with st.chat_message("assistant"):
-        with st.spinner("Processing response..."):
+    # Display chat history. Streamlit drops any element a rerun does not
+    # write, so history is re-emitted every run; unchanged messages are diffed
+    # away by the frontend rather than repainted. New turns go into the same
+    # container.
+    chat_container = st.container()
+    with chat_container:
+        for message in st.session_state.messages:
+            with st.chat_message(message["role"]):
+                if message["role"] == "assistant":
+                    render_response(message["content"])
+                else:
+                    st.markdown(message["content"])
+        
+        # Errors are shown on the rerun that follows a failed request
+        if st.session_state.response_failed:
+            st.session_state.response_failed = False
+            st.error(
+                "An error occurred while processing your request. "
+                "Please verify your API key is valid and try again."
+            )
+            st.info(
+                "Troubleshooting:\n"
+                "1. Verify GROQ_API_KEY in your .env file\n"
+                "2. Check your internet connection\n"
+                "3. Ensure your API key is still valid\n"
+                "4. Try with a shorter input"
+            )
+
+    user_input = st.chat_input(
+        "Enter your question or share your answer...",
+        key="user_input",
+        disabled=st.session_state.in_flight
+    )
+
+    # An accepted message is parked in pending_input and the section reruns,
+    # so the input is drawn disabled for the whole time the reply streams
+    if user_input and accept_submission():
+        st.session_state.pending_input = user_input
+        st.session_state.in_flight = True
+        rerun_chat_section()
+    
+    user_input = st.session_state.pending_input
+    if user_input is not None:
+        st.session_state.pending_input = None
+        
+        # Add user message to history
+        st.session_state.messages.append({
+            "role": "user",
+            "content": user_input
+        })
+        st.session_state.message_count += 1
+        prune_session()
+        
+        # Display user message
+        with chat_container.chat_message("user"):
+            st.markdown(user_input)
+        
+        # Get LLM response
+        with chat_container.chat_message("assistant"):
             try:
-                import time
-                start_time = time.time()
-                
-                # Build messages for LLM
-                system_prompt = get_system_prompt(interview_type)
-                messages = [
-                    {"role": "system", "content": system_prompt}
-                ]
+                # Build messages for LLM. The system prompt always comes first and
+                # history is appended after it, so consecutive requests share an
+                # identical prefix that the provider can serve from its prompt
+                # cache. The window slides in blocks rather than every turn, so
+                # the prefix is stable until it slides or an over-budget prompt
+                # has old exchanges trimmed. Anything dynamic must go after the
+                # history.
+                messages = [get_system_message(interview_type)]
                 
-                # Add conversation history
-                messages.extend(format_conversation_history(st.session_state.messages[:-1]))
+                # Add the recent exchanges plus the new user message. Everything
+                # appended to st.session_state.messages is already a
+                # {"role", "content"} dict, so it is passed to the LLM as-is.
+                # Older turns stay visible in the UI but are not sent.
+                history = st.session_state.messages
+                messages.extend(history[history_window_start(history, max_history_turns):])
                 
-                # Get response from LLM
-                response = llm.invoke(messages)
-                output = response.content
+                # Trim oldest turns rather than let an oversized request fail upstream
+                messages = fit_to_token_budget(messages)
+                acquire_rate_limit(count_prompt_tokens(messages))
                 
-                duration = time.time() - start_time
+                # Time the LLM call only, not any rate-limit wait before it
+                start_time = perf_counter()
                 
-                # Parse response
-                main_content, score_content = parse_response_with_score(output)
+                # Stream response from LLM, rendering tokens as they arrive
+                placeholder = st.empty()
+                output = placeholder.write_stream(coalesce_tokens(stream_tokens(llm, messages)))
                 
-                # Display main response
-                st.markdown(main_content)
+                duration = perf_counter() - start_time
                 
-                # Display score if present
-                if score_content:
-                    st.markdown(f"<div class='feedback-score'>{score_content}</div>", unsafe_allow_html=True)
+                # Replace the raw stream with the parsed response and score
+                with placeholder.container():
+                    render_response(output)
                 
                 # Log interaction
                 log_interaction(interview_type, user_input, output, duration)
@@ -490,21 +844,21 @@ if user_input := st.chat_input(
                     "role": "assistant",
                     "content": output
                 })
+                prune_session()
                 
             except Exception as e:
-                logger.error(f"Error processing response: {str(e)}")
-                error_message = (
-                    "An error occurred while processing your request. "
-                    "Please verify your API key is valid and try again."
-                )
-                st.error(error_message)
-                st.info(
-                    "Troubleshooting:\n"
-                    "1. Verify GROQ_API_KEY in your .env file\n"
-                    "2. Check your internet connection\n"
-                    "3. Ensure your API key is still valid\n"
-                    "4. Try with a shorter input"
-                )
+                logger.error("Error processing response: %s", e)
+                st.session_state.response_failed = True
+            
+            finally:
+                st.session_state.in_flight = False
+        
+        # Redraw with the input enabled again. This sits outside the finally
+        # so an interrupting rerun keeps its own scope.
+        rerun_chat_section()
+
+
+chat_section(llm, interview_type, max_history_turns)
 
 # ============================================
 # FOOTER